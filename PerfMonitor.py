@@ -16,12 +16,204 @@ from tkinter import Tk, N, S, E, W, StringVar, Listbox, MULTIPLE
 import tkinter.ttk as ttk
 import re
 import psutil
-import winstats
+try:
+    import winstats
+except ImportError:  # Not on Windows. Only "replay" can run without it.
+    winstats = None
 import numpy
 import matplotlib.pyplot as plt
 import matplotlib.ticker
 
 
+class LiveCounterSource:
+    """Live performance counters from winstats and processes from psutil, on the wall clock."""
+
+    def __init__(self):
+        self.tree_parent = {}    # (pid, create time) -> ppid for every process seen, kept up to date each tick.
+        self.tree_children = {}  # ppid -> set of child (pid, create time), the reverse of tree_parent.
+        self.tree_usage = {}     # pid -> (name, private bytes, working set) for the root and its descendants.
+
+    def stats_checker(self, stats):
+        pass  # Live counters that are down get reported tick by tick instead.
+
+    def get_perf_data(self, stat):
+        return winstats.get_perf_data(stat, fmts='double')
+
+    def process_iter(self):
+        return psutil.process_iter()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def process_tree_tracker(self):
+        """One psutil pass over all processes. Only the ones that started or exited since last tick touch the
+        parent->children map. Returns this tick's snapshot as {(pid, create time): info}"""
+
+        snapshot = {}
+        for p in psutil.process_iter(['ppid', 'name', 'memory_info']):
+            try:
+                snapshot[(p.pid, p.create_time())] = p.info
+            except psutil.NoSuchProcess:  # Gone already.
+                continue
+            except psutil.AccessDenied:  # No create time, so a reused pid can't be told apart for this one.
+                snapshot[(p.pid, None)] = p.info
+
+        # Keyed on (pid, create time), so a reused pid shows up as one process gone and a new one started.
+        for ident in set(self.tree_parent) - set(snapshot):  # Processes that went away.
+            parent = self.tree_parent.pop(ident)
+            self.tree_children[parent].discard(ident)
+            if not self.tree_children[parent]:
+                del self.tree_children[parent]
+
+        for ident in set(snapshot) - set(self.tree_parent):  # Processes that showed up.
+            parent = snapshot[ident]['ppid']  # None if we weren't allowed to read it.
+            self.tree_parent[ident] = parent
+            self.tree_children.setdefault(parent, set()).add(ident)
+
+        return snapshot
+
+    def tree_totals(self, root_pid, stats_list_tree):
+        """Sum private bytes and working set of the root process and all its descendants, returns both totals"""
+
+        snapshot = self.process_tree_tracker()
+        self.tree_usage = {}
+
+        # Walk down the tree from the monitored process (which may have restarted with a new pid).
+        to_visit = [ident for ident in snapshot if ident[0] == root_pid]
+        while to_visit:
+            ident = to_visit.pop()
+            pid, started = ident
+            info = snapshot[ident]
+            mem = info['memory_info']
+            if mem is not None:  # None if we weren't allowed to read it, but still walk into its children.
+                # On Windows "private" is the Private Bytes counter, "rss" is the Working Set.
+                self.tree_usage[pid] = (info['name'], getattr(mem, 'private', mem.vms), mem.rss)
+            for child in self.tree_children.get(pid, ()):
+                # A child can't be older than its parent. Older ones belong to a previous owner of a reused pid.
+                if started is None or child[1] is None or child[1] >= started:
+                    to_visit.append(child)
+
+        tree_private = sum(usage[1] for usage in self.tree_usage.values())
+        tree_wset = sum(usage[2] for usage in self.tree_usage.values())
+
+        return [tree_private, tree_wset]
+
+
+class ReplayProcess:
+    """Just enough of a psutil.Process for process_checker, built from a trace row."""
+
+    def __init__(self, name, pid):
+        self._name = name
+        self.pid = pid
+
+    def name(self):
+        return self._name
+
+
+class ReplayCounterSource:
+    """Plays a recorded (or synthetic) csv trace back through data_collector in place of winstats and psutil.
+
+    Time is virtual: every sleep() moves on to the next row of the trace and its timestamp, and only really sleeps
+    when speed > 0, so speed 1 replays in real time and speed 0 replays as fast as possible.
+    A process restarts whenever its "ID Process" column changes. Without one it never restarts."""
+
+    def __init__(self, trace_filename, speed=0.0):
+        if not os.path.isfile(trace_filename):  # Check for existing csv file.
+            print("File name: ", trace_filename, " does not exist. Maybe you need to record data first ?")
+            exit(2)
+        if os.path.getsize(trace_filename) == 0:  # Check for empty csv file.
+            print("File name: ", trace_filename, " is empty. Maybe your last recording did not work ?")
+            exit(2)
+
+        with open(trace_filename, 'rt') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            self.rows = [row for row in reader if row]
+
+        # Recorded files use a space as quotechar, which pads and doubles the spaces. So match names without spaces.
+        # Column 0 of every row is the timestamp, so header j is row column j + 1.
+        self.columns = {"".join(stat.split()): j + 1 for j, stat in enumerate(header)}
+        self.instances = []
+        for stat in self.columns:
+            instance = re.search(r'\((.*?)\)', stat)
+            if instance and instance.group(1) not in self.instances:
+                self.instances.append(instance.group(1))
+
+        self.speed = speed
+        self.tick = 0
+        self.tree_usage = {}  # The trace only has the tree totals, not the processes behind them.
+
+        # Start the virtual clock where the recording started.
+        self.clock = self.row_time(0)
+        if self.clock is None:  # Synthetic trace without usable timestamps.
+            self.clock = time.time()
+
+    def stats_checker(self, stats):
+        """Make sure the trace has every stat the world needs, before any data is written"""
+
+        for stat in stats:
+            if "".join(stat.split()).endswith(r'\IDProcess'):
+                continue  # Optional, older recordings don't have it.
+            if "".join(stat.split()) not in self.columns:
+                print("Stat: ", stat, " is not in the trace file. Wrong world, esf or --tree for this file ?")
+                exit(2)
+
+    def row_time(self, tick):
+        """Timestamp of a row, or None if there isn't a usable one"""
+
+        try:
+            return dt.datetime.strptime(" ".join(self.rows[tick][0].split()), "%m/%d/%y %H:%M").timestamp()
+        except (IndexError, ValueError):
+            return None
+
+    def pid_of(self, n, instance):
+        """Recorded pid of a process, or a stand-in that never changes if the trace has no "ID Process" column"""
+
+        try:
+            return int(float(self.rows[self.tick][self.columns[rf'\Process({instance})\IDProcess']]))
+        except (KeyError, IndexError, ValueError):
+            return n + 1
+
+    def get_perf_data(self, stat):
+        """Same shape as winstats.get_perf_data(), and raises OSError like it when the stat is not there"""
+
+        key = "".join(stat.split())
+        instance = re.search(r'\((.*?)\)', key)
+        if key.endswith(r'\IDProcess') and instance and instance.group(1) in self.instances:
+            return (float(self.pid_of(self.instances.index(instance.group(1)), instance.group(1))),)
+
+        try:
+            return (float(self.rows[self.tick][self.columns[key]]),)
+        except (KeyError, IndexError, ValueError):
+            raise OSError(f"{stat} is not in the trace at tick {self.tick}")
+
+    def tree_totals(self, root_pid, stats_list_tree):
+        """Tree totals were recorded as ordinary columns"""
+
+        return [self.get_perf_data(i)[0] for i in stats_list_tree]
+
+    def process_iter(self):
+        for n, instance in enumerate(self.instances):
+            yield ReplayProcess(instance + '.exe', self.pid_of(n, instance))
+
+    def time(self):
+        return self.clock
+
+    def sleep(self, seconds):
+        """Move on to the next row. Gaps in the recording stay gaps, unless the row has no usable timestamp"""
+
+        self.tick += 1
+        next_clock = self.row_time(self.tick)
+        if next_clock is None:
+            next_clock = self.clock + seconds
+        if self.speed > 0:
+            time.sleep(max(next_clock - self.clock, 0) / self.speed)
+        self.clock = next_clock
+
+
 class PerfMonitor:
     """Performance Monitoring for Idemia DocAuth"""
 
@@ -33,11 +225,13 @@ class PerfMonitor:
     monitored_pid_counter = 0
     headers = []
     reslist = list()
+    counter_source = LiveCounterSource()  # Swapped for a ReplayCounterSource when replaying a trace.
+    output_filename_override = ""  # Replay writes here instead of over the world's recorded csv file.
 
     def process_checker(self, process_to_monitor):
         """Verify that important IDEMIA... processes are running"""
 
-        for p in psutil.process_iter():
+        for p in self.counter_source.process_iter():
             try:
                 if process_to_monitor in p.name():
                     if self.monitored_pid == 0:  # If this is the first time through, capture the name and pid.
@@ -47,7 +241,7 @@ class PerfMonitor:
                         self.monitored_pid_counter += 1  # Track times that the process has restarted
                         self.monitored_pid = p.pid       # Get new pid value for the process
                     return True
-            except WindowsError as error:  # Main Processes down? Can't find it to count. Continue the loop.
+            except OSError as error:  # Main Processes down? Can't find it to count. Continue the loop.
                 print(f"The main Process was not available for interrogation and counting:", process_to_monitor)
                 # time.sleep(self.time_measure_seconds)  # Sleep for time slice, otherwise this keeps throwing message.
 
@@ -64,6 +258,9 @@ class PerfMonitor:
             parser_report = subparsers.add_parser('report')
             # Add a required argument.
             parser_report.add_argument('world', metavar='world', choices=['dotnetworld', 'mobileDLworld', 'biocoreworld', 'ecatworld', 'oldworld', 'oldserviceworld', 'newworld', 'catcworld', 'audiodgworld', 'autocatworld'], type=str, help='[dotnetworld | biocoreworld | ecatworld | oldworld | oldserviceworld | newworld | catcworld | audiodgworld | autocatworld]')
+            # Add an optional argument, e.g. to report on the output of a replay.
+            parser_report.add_argument('csvfile', nargs='?', default='', type=str,
+                                       help='csv file to report on instead of the world\'s recorded file')
 
             # Subparser for "Record".
             parser_record = subparsers.add_parser('record')
@@ -71,6 +268,20 @@ class PerfMonitor:
             parser_record.add_argument('world', metavar='world', choices=['dotnetworld', 'mobileDLworld', 'biocoreworld', 'ecatworld', 'oldworld', 'oldserviceworld', 'newworld', 'catcworld', 'audiodgworld', 'autocatworld'], type=str, help='[dotnetworld | biocoreworld | ecatworld | oldworld | oldserviceworld | newworld | catcworld | audiodgworld | autocatworld]')
             parser_record.add_argument('esf', choices=['esf', 'noesf'], type=str)
             parser_record.add_argument('hours', type=int, help='number of hours')
+            parser_record.add_argument('--tree', action='store_true',
+                                       help='also record summed memory of the monitored process and all its children')
+
+            # Subparser for "Replay".
+            parser_replay = subparsers.add_parser('replay')
+            # Add required arguments.
+            parser_replay.add_argument('world', metavar='world', choices=['dotnetworld', 'mobileDLworld', 'biocoreworld', 'ecatworld', 'oldworld', 'oldserviceworld', 'newworld', 'catcworld', 'audiodgworld', 'autocatworld'], type=str, help='[dotnetworld | biocoreworld | ecatworld | oldworld | oldserviceworld | newworld | catcworld | audiodgworld | autocatworld]')
+            parser_replay.add_argument('esf', choices=['esf', 'noesf'], type=str)
+            parser_replay.add_argument('tracefile', type=str, help='recorded or synthetic csv file to play back')
+            parser_replay.add_argument('outfile', type=str, help='csv file to write the replayed data to')
+            parser_replay.add_argument('--speed', type=float, default=0.0,
+                                       help='1 = real time, 60 = a minute per second, 0 = as fast as possible (default)')
+            parser_replay.add_argument('--tree', action='store_true',
+                                       help='also replay the process tree totals recorded with --tree')
 
             # Parse the arguments
             args = parser.parse_args()
@@ -135,7 +346,7 @@ class PerfMonitor:
         frame.grid(column=0, row=0, sticky=(N, S, E, W))
 
         perf_values = StringVar()
-        perf_values.set(self.headers)
+        perf_values.set([i for i in self.headers if not i.strip().endswith(r'\IDProcess')])  # Pids aren't memory.
 
         perf_box = Listbox(frame, listvariable=perf_values, selectmode=MULTIPLE, width=60, height=20)
         perf_box.grid(column=0, row=0, columnspan=1)
@@ -166,80 +377,66 @@ class PerfMonitor:
                       "Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_DotNetWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'mobileDLworld':
             process_name_to_monitor = 'MobileDLReaderSampleApp.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("Standalone MobileDLReaderSampleApp is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_MobileDLReaderSampleAppWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'biocoreworld':
             process_name_to_monitor = 'IDEMIA.DocAuth.BiometricService.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("BioCore is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_BioCoreWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'ecatworld':
             process_name_to_monitor = 'ECAT.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("ECAT is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_EcatWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'newworld':
             process_name_to_monitor = 'IDEMIA.DocAuth.Document.App.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("DocAuth is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'oldworld':
             process_name_to_monitor = 'DocAuth.Applications.Authenticate.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("DocAuth is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_OldWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'oldserviceworld':
             process_name_to_monitor = 'DocAuth.WindowsService.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("DocAuth Services is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_OldServiceWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'catcworld':
             process_name_to_monitor = 'CATC.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("IPS.exe is NOT running. Please startup CATC BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_CatcWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'audiodgworld':
             process_name_to_monitor = 'audiodg.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("audiodg is NOT running. Please startup DocAuth BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_Audiodg.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
         elif which_world == 'autocatworld':
             process_name_to_monitor = 'IDEMIA.DocAuth.CAT.App.exe'
             if not self.process_checker(process_name_to_monitor):
                 print("IDEMIA.DocAuth.CAT.App.exe is NOT running. Please startup AutoCAT BEFORE running this PerformanceMonitor.")
                 exit(2)
             output_filename = r'c:\Temp\DocAuthPerfData_AutocatWorld.csv'
-            f = open(output_filename, 'wt', buffering=1)
-            writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
+
+        if self.output_filename_override:
+            output_filename = self.output_filename_override
+
+        f = open(output_filename, 'wt', buffering=1)
+        writer = csv.writer(f, delimiter=',', quotechar=' ', lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
 
         return f, writer, output_filename
 
@@ -248,6 +445,17 @@ class PerfMonitor:
 
         choicetemp = self.command_line_arguments()
 
+        # Either play back a trace on a virtual clock, or read live counters.
+
+        if choicetemp.subcommand == 'replay':
+            self.counter_source = ReplayCounterSource(choicetemp.tracefile, choicetemp.speed)
+            self.output_filename_override = choicetemp.outfile
+            self.time_max_ticks = len(self.counter_source.rows)
+            choicetemp.hours = round(self.time_max_ticks * self.time_measure_seconds / 3600, 2)
+        elif winstats is None:
+            print("winstats is NOT available, it only runs on Windows. Use 'replay' to play back a recorded file.")
+            exit(2)
+
         # Verify that DocAuth IS running, and assign csv filename based on old vs new world
 
         f, writer, output_filename = self.process_to_monitor(which_world)
@@ -255,6 +463,8 @@ class PerfMonitor:
         print("\nVerified that DocAuth IS running. Recording data for ", choicetemp.hours, " hours...")
         print("CTRL-C to stop recording earlier.")
 
+        wall_clock_start = time.time()  # Real time, to measure replay throughput.
+
         # Run through ticks (time) for x-axis.
 
         stats_list_audiodgworld = [r'\Process(audiodg)\Private Bytes',
@@ -464,19 +674,35 @@ class PerfMonitor:
         else:  # monitoring just audiodg process:
             stats_list = stats_list_audiodgworld
 
+        # Summed memory of the monitored process and everything it launched (node, java#N, IA#N, etc.)
+        tree_name = self.monitored_process_name.replace('.exe', '') + '_Tree'
+        # NOTE: psutil only gives the full Working Set, shared pages included. Summed over processes sharing the
+        # same .NET/JVM DLLs those pages count more than once, so it is NOT comparable to "Working Set - Private".
+        stats_list_tree = [rf'\Process({tree_name})\Private Bytes',
+                           rf'\Process({tree_name})\Working Set']
+
+        # Pid of the monitored process (a real Windows counter), so a replay of this file can count its restarts too.
+        pid_name = self.monitored_process_name.replace('.exe', '')
+        stats_list_pid = [rf'\Process({pid_name})\ID Process']
+
         # Capture ESF data only if 'ESF' argument was given on commandline.
 
         # Write header file to csv containing name of all perf stats being tracked.
+        header = list(stats_list)
         if choicetemp.esf == 'esf':
             # Write the perf names to the csv file including ESF stats.
-            writer.writerow(stats_list + stats_list_esf)
-        else:
-            # Write perf names to the csv file NOT including ESF stats.
-            writer.writerow(stats_list)
+            header += stats_list_esf
+        if choicetemp.tree:
+            # Process tree totals come after all the per process stats.
+            header += stats_list_tree
+        # Monitored pid always goes last.
+        header += stats_list_pid
+        self.counter_source.stats_checker(header)
+        writer.writerow(header)
 
         for ticks in range(self.time_max_ticks):  # 1440 = 12 hours for 30 second tick | 4320 = 36 hours
 
-            time_track = dt.datetime.fromtimestamp(time.time())  # Get timestamp-style time
+            time_track = dt.datetime.fromtimestamp(self.counter_source.time())  # Get timestamp-style time
             time_track = time_track.strftime("%m/%d/%y %H:%M")   # Keep "m/d/y h/m" drop seconds.milliseconds
             print(time_track, end=" ")
 
@@ -487,41 +713,66 @@ class PerfMonitor:
                 # perf data in case one or more of them were down.
                 # line_of_data = [winstats.get_perf_data(i, fmts='double') for i in stats_list]
 
+                # See if the DocAuth service has restarted. IF there is a new pid, then it did restart.
+                # Done first, so the pid and process tree recorded below belong to this tick.
+                self.process_checker(self.monitored_process_name)
+
                 # This is where we REALLY interrogate the statistics.
 
                 line_of_data = []
                 line_of_data_esf = []
 
                 for i in stats_list:
-                    line_of_data.append(winstats.get_perf_data(i, fmts='double'))
+                    line_of_data.append(self.counter_source.get_perf_data(i))
+
+                row_of_data = [time_track, self.string_cleaner("data", line_of_data)]
 
                 # Capture ESF data only if 'ESF' argument was given on commandline.
 
                 if choicetemp.esf == 'esf':
                     for i in stats_list_esf:
                         # line_of_data_esf = [winstats.get_perf_data(i, fmts='double') for i in stats_list_esf]
-                        line_of_data_esf.append(winstats.get_perf_data(i, fmts='double'))
+                        line_of_data_esf.append(self.counter_source.get_perf_data(i))
 
-                    # Write a row of stats to the csv file including ESF stats.
-                    writer.writerow((time_track, self.string_cleaner("data", line_of_data),
-                                     self.string_cleaner("data", line_of_data_esf)))
-                else:
-                    # Write a row of stats to the csv file NOT including ESF stats.
-                    writer.writerow((time_track, self.string_cleaner("data", line_of_data)))
+                    # Add ESF stats to the row.
+                    row_of_data.append(self.string_cleaner("data", line_of_data_esf))
 
-                # Output test status to console.
-                print(" tick:", ticks, "of", self.time_max_ticks, " name:", self.monitored_process_name, " pid:",
-                      self.monitored_pid, ", was restarted ", self.monitored_pid_counter, " times.")
+                # Capture process tree totals only if '--tree' argument was given on commandline.
 
-                # See if the DocAuth service has restarted. IF there is a new pid, then it did restart.
-                self.process_checker(self.monitored_process_name)
+                if choicetemp.tree:
+                    line_of_data_tree = self.counter_source.tree_totals(self.monitored_pid, stats_list_tree)
+                    row_of_data.append(self.string_cleaner("data", line_of_data_tree))
+
+                # Record the monitored pid.
 
-                time.sleep(self.time_measure_seconds)  # Sleep for time slice
+                for i in stats_list_pid:
+                    row_of_data.append(int(self.counter_source.get_perf_data(i)[0]))
 
-            except WindowsError as error:  # Processes down? Winstat errors out, so handle it. Continue the loop.
+                # Write a row of stats to the csv file.
+                writer.writerow(row_of_data)
+
+                # Output test status to console.
+                print(" tick:", ticks, "of", self.time_max_ticks, " name:", self.monitored_process_name, " pid:",
+                      self.monitored_pid, ", was restarted ", self.monitored_pid_counter, " times.", end="")
+                if choicetemp.tree and self.counter_source.tree_usage:
+                    print(" tree:", len(self.counter_source.tree_usage), "processes,",
+                          round(line_of_data_tree[0] / 1000000, 1), "MB private.", end="")
+                elif choicetemp.tree:
+                    print(" tree:", round(line_of_data_tree[0] / 1000000, 1), "MB private.", end="")
+                print()
+
+                # Per process breakdown of the tree, e.g. "node(1234) 52.3MB". Only filled in when recording live.
+                if self.counter_source.tree_usage:
+                    tree_usage = sorted(self.counter_source.tree_usage.items())
+                    print("   ", ", ".join(f"{name}({pid}) {round(private / 1000000, 1)}MB"
+                                          for pid, (name, private, wset) in tree_usage))
+
+                self.counter_source.sleep(self.time_measure_seconds)  # Sleep for time slice
+
+            except OSError as error:  # Processes down? Winstat errors out, so handle it. Continue the loop.
                 # print(f"One of the processes was not available for interrogation:", error)
                 print(f"Process was not available for interrogation:", self.string_cleaner("badstatname", i))
-                time.sleep(self.time_measure_seconds)  # Sleep for time slice, otherwise this keeps throwing message.
+                self.counter_source.sleep(self.time_measure_seconds)  # Sleep for time slice, otherwise this keeps throwing message.
 
             except KeyboardInterrupt as error:  # On ctrl-c from keyboard, flush buffer, close file, exit. Break loop.
                 print("\n\nExiting due to user action...")
@@ -533,6 +784,11 @@ class PerfMonitor:
         print("\nData was collected and stored in file: ", output_filename)
         print(self.monitored_process_name, " was restarted ", self.monitored_pid_counter, " times.")
 
+        if choicetemp.subcommand == 'replay':
+            wall_clock_elapsed = time.time() - wall_clock_start
+            print("Replayed", self.counter_source.tick, "ticks in", round(wall_clock_elapsed, 2), "seconds,",
+                  round(self.counter_source.tick / max(wall_clock_elapsed, 1e-9)), "ticks per second.")
+
     def file_reader(self, input_filename):
         """Read in csv performance file, line by line"""
 
@@ -649,6 +905,11 @@ def main():
         pm.data_collector("audiodgworld")
     elif choice.subcommand == "record" and choice.world == "autocatworld":
         pm.data_collector("autocatworld")
+    elif choice.subcommand == "replay":
+        pm.data_collector(choice.world)
+    elif choice.subcommand == "report" and choice.csvfile:
+        pm.file_reader(choice.csvfile)
+        pm.data_plotter()
     elif choice.subcommand == "report" and choice.world == "oldworld":
         pm.file_reader(r"c:\Temp\DocAuthPerfData_OldWorld.csv")
         pm.data_plotter()